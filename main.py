@@ -1,34 +1,168 @@
-import re
-import pandas as pd
-from datetime import datetime
-import aiohttp
+import argparse
 import asyncio
-import async_timeout
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-from tqdm import tqdm
+import contextlib
+import functools
+import itertools
+import mmap
+import multiprocessing
+import os
+import queue
+import random
+import re
+import sqlite3
+import sys
+import threading
 import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urlparse, urlsplit, urlunsplit
 
 CHAT_FILE = "chat.txt"
 OUTPUT_EXCEL = "extracted_links.xlsx"
 
+# Files larger than this are parsed in parallel shards
+PARALLEL_PARSE_THRESHOLD = 64 * 1024 * 1024
+PARSE_WORKERS = os.cpu_count() or 1
+# Process pools start while the parser and Excel writer threads are running, and
+# forking a multi-threaded process can deadlock, so workers are never forked
+PROCESS_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Upper bound on shard size, so the first entries arrive before a whole
+# 1/PARSE_WORKERS of the file is parsed
+PARALLEL_SHARD_BYTES = 8 * 1024 * 1024
+# Shards submitted ahead of the consumer, per worker; bounds parsed-but-unread entries
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
 # Regex patterns
 DATE_PATTERN = (
-    r"^(\d{1,2}/\d{1,2}/\d{2,4}),\s*(\d{1,2}:\d{2}\s*[apAP][mM])\s*-\s*(.*?):\s*(.*)$"
+    r"^(\d{1,2}/\d{1,2}/\d{2,4}),\s*(\d{1,2}:\d{2}\s*[apAP][mM])\s*-\s*([^:]*):\s*(.*)$"
 )
 URL_PATTERN = r"(https?://[^\s]+)"
+URL_BYTES_PATTERN = re.compile(rb"https?://")
+HEADER_BYTES_PATTERN = re.compile(rb"^\d{1,2}/\d{1,2}/\d{2,4},", re.MULTILINE)
+
+# Supported export date/time formats, in order of preference
+DATETIME_FORMATS = [
+    "%d/%m/%y %I:%M %p",
+    "%d/%m/%Y %I:%M %p",
+    "%m/%d/%y %I:%M %p",
+    "%m/%d/%Y %I:%M %p",
+    "%d/%m/%y %H:%M",
+    "%d/%m/%Y %H:%M",
+]
+# Header lines sampled (within the first N lines) to detect the export format
+DATETIME_SAMPLE_SIZE = 500
+DATETIME_SAMPLE_LINES = 20000
+# URL rows converted per vectorized pd.to_datetime call
+DATETIME_BATCH_SIZE = 50000
+# Distinct raw (date, time) pairs kept in the parsed timestamp cache
+DATETIME_CACHE_SIZE = 65536
+
+# Only the start of each page is downloaded: up to </head> or this many bytes
+MAX_HTML_BYTES = 64 * 1024
+HTML_CHUNK_SIZE = 8192
+HEAD_END_PATTERN = re.compile(rb"</head\s*>", re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?([\w-]+)", re.IGNORECASE
+)
+
+# Fetch concurrency: overall, per host, and connection pool settings.
+# Limits start at the INITIAL_* values and adapt (AIMD) up to the MAX_* ceilings.
+INITIAL_CONCURRENT_FETCHES = 16
+MAX_CONCURRENT_FETCHES = 200
+INITIAL_FETCHES_PER_HOST = 2
+MAX_FETCHES_PER_HOST = 8
+# Multiplicative backoff on timeouts/429/503; only fast 2xx/3xx responses raise limits
+AIMD_DECREASE = 0.5
+AIMD_COOLDOWN_SECONDS = 1.0
+SLOW_FETCH_SECONDS = 5
+OVERLOAD_STATUSES = {429, 503}
+# Hosts listed with their limits in the run summary, busiest or most backed off first
+SUMMARY_TOP_HOSTS = 5
+KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
+
+# Retry policy for transient fetch failures
+FETCH_TIMEOUT = 15
+FETCH_MAX_ATTEMPTS = 4
+FETCH_DEADLINE_SECONDS = 60
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 20
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Queue depth (as a multiple of max concurrency) between URL producer and fetchers
+FETCH_QUEUE_FACTOR = 2
+# URLs parked for saturated hosts may exceed that depth up to this many, so a
+# dominant host cannot keep URLs for other hosts from being read
+FETCH_DEFERRED_MAX = 10000
+FETCH_PRODUCER_YIELD_EVERY = 100
+
+# Parsed URL entries are handed from the parser thread to the fetch stage in chunks
+PARSE_CHUNK_SIZE = 256
+PARSE_QUEUE_CHUNKS = 16
+
+# Worker processes for HTML parsing during fetches (0 parses on the event loop)
+HTML_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+# Sampling interval for the event loop lag monitor
+LOOP_LAG_INTERVAL = 0.05
+
+# Content types whose body is parsed for a title; anything else gets a synthetic one
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
 
 # Headers for HTTP requests
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
+# Persistent metadata cache shared across runs
+METADATA_CACHE_FILE = "link_metadata_cache.sqlite3"
+METADATA_CACHE_SCHEMA_VERSION = 2
+METADATA_CACHE_TTL = 7 * 24 * 3600
+METADATA_CACHE_MAX_AGE = 30 * 24 * 3600
+METADATA_CACHE_MAX_ENTRIES = 500_000
+# Writes are committed in batches: after this many, or this many seconds
+METADATA_CACHE_COMMIT_EVERY = 100
+METADATA_CACHE_COMMIT_SECONDS = 5.0
+# How long each class of failed fetch is remembered before retrying
+NEGATIVE_CACHE_TTLS = {
+    "not_found": 3 * 24 * 3600,
+    "client_error": 6 * 3600,
+    "rate_limited": 5 * 60,
+    "server_error": 10 * 60,
+    "timeout": 10 * 60,
+    "connection": 30 * 60,
+    "invalid": 30 * 24 * 3600,
+    "error": 3600,
+}
+
+# Query parameters dropped during URL canonicalization
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "si", "mc_cid", "mc_eid"}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
 # Cache for storing fetched titles and descriptions
 FETCH_CACHE = {}
 
+# Fetches currently in progress, shared by concurrent callers for the same URL
+INFLIGHT_FETCHES = {}
+
+# Timestamp cache hits/misses reported back by parser worker processes
+WORKER_DATETIME_CACHE_STATS = {"hits": 0, "misses": 0}
+# Parsed timestamps kept across vectorized batches, by (raw value, format), in
+# LRU order; and lookups that found (hits) or had to parse (misses) a value
+BATCH_DATETIME_CACHE = OrderedDict()
+BATCH_DATETIME_CACHE_STATS = {"hits": 0, "misses": 0}
+
 
-def animate_text(text, delay=0.05):
-    """Print text with typewriter effect"""
+def animate_text(text, delay=0.05, animate=True):
+    """Print text with typewriter effect, or all at once when not animating"""
+    if not animate:
+        print(text)
+        return
     for char in text:
         print(char, end="", flush=True)
         time.sleep(delay)
@@ -48,20 +182,20 @@ def clean_time_string(time_str):
     return time_str
 
 
-def parse_datetime(date_str, time_str):
-    """Parse datetime with multiple format attempts"""
+def parse_datetime(date_str, time_str, preferred_format=None):
+    """Parse datetime, trying the file's detected format before the full search"""
     time_str = clean_time_string(time_str)
-    datetime_formats = [
-        "%d/%m/%y %I:%M %p",
-        "%d/%m/%Y %I:%M %p",
-        "%m/%d/%y %I:%M %p",
-        "%m/%d/%Y %I:%M %p",
-        "%d/%m/%y %H:%M",
-        "%d/%m/%Y %H:%M",
-    ]
-    for fmt in datetime_formats:
+    value = f"{date_str} {time_str}".lower()
+    if preferred_format:
+        try:
+            return datetime.strptime(value, preferred_format)
+        except ValueError:
+            pass
+    for fmt in DATETIME_FORMATS:
+        if fmt == preferred_format:
+            continue
         try:
-            return datetime.strptime(f"{date_str} {time_str}".lower(), fmt)
+            return datetime.strptime(value, fmt)
         except ValueError:
             continue
     try:
@@ -75,101 +209,1595 @@ def parse_datetime(date_str, time_str):
     raise ValueError(f"Unable to parse datetime: '{date_str} {time_str}'")
 
 
-async def fetch_title_description(session, url, semaphore):
-    """Fetch title and description asynchronously"""
-    # Check cache first
+@functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def parse_datetime_cached(date_str, time_str, preferred_format=None):
+    """Parse datetime, memoized on the raw (date, time) strings"""
+    return parse_datetime(date_str, time_str, preferred_format)
+
+
+def datetime_cache_stats():
+    """Return (hits, misses) for the timestamp cache across all processes"""
+    info = parse_datetime_cached.cache_info()
+    return (
+        info.hits
+        + WORKER_DATETIME_CACHE_STATS["hits"]
+        + BATCH_DATETIME_CACHE_STATS["hits"],
+        info.misses
+        + WORKER_DATETIME_CACHE_STATS["misses"]
+        + BATCH_DATETIME_CACHE_STATS["misses"],
+    )
+
+
+class MessageHeaderParser:
+    """Match chat message headers with precompiled patterns and cheap pre-checks"""
+
+    def __init__(self, date_pattern=DATE_PATTERN, url_pattern=URL_PATTERN):
+        self.date_regex = re.compile(date_pattern)
+        self.url_regex = re.compile(url_pattern)
+
+    def is_message_start(self, line):
+        """Cheaply check for the date prefix that begins every message or notice"""
+        if not line or not line[0].isdigit():
+            return False
+        comma = line.find(",", 1, 11)
+        return comma != -1 and "/" in line[1:comma]
+
+    def parse(self, line):
+        """Return (date_str, time_str, sender, message) or None for non-header lines"""
+        if not self.is_message_start(line):
+            return None
+        match = self.date_regex.match(line)
+        return match.groups() if match else None
+
+    def find_urls(self, message):
+        """Return URLs in a message, skipping the regex when there is no scheme"""
+        if "://" not in message:
+            return []
+        return self.url_regex.findall(message)
+
+
+HEADER_PARSER = MessageHeaderParser()
+
+
+def sample_datetime_strings(path, limit=DATETIME_SAMPLE_SIZE):
+    """Collect (date_str, time_str) pairs from header lines near the top of the file"""
+    samples = []
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        for line in itertools.islice(file, DATETIME_SAMPLE_LINES):
+            header = HEADER_PARSER.parse(line.strip())
+            if header:
+                samples.append(header[:2])
+                if len(samples) >= limit:
+                    break
+    return samples
+
+
+def detect_datetime_format(samples):
+    """Pick the format that parses the most samples, settling %d/%m vs %m/%d"""
+    values = [
+        f"{date_str} {clean_time_string(time_str)}".lower()
+        for date_str, time_str in samples
+    ]
+    best_format, best_count = None, 0
+    for fmt in DATETIME_FORMATS:
+        count = 0
+        for value in values:
+            try:
+                datetime.strptime(value, fmt)
+                count += 1
+            except ValueError:
+                continue
+        if count > best_count:
+            best_format, best_count = fmt, count
+    return best_format
+
+
+def truncate_line(line, limit=100):
+    """Shorten a chat line for reports"""
+    return line[:limit] + "..." if len(line) > limit else line
+
+
+def find_header_start(mm, pos, line_start):
+    """Walk back from a line to the closest message header after pos, if any"""
+    scan = line_start - 1
+    while scan > pos:
+        prev_start = mm.rfind(b"\n", pos, scan) + 1 or pos
+        if HEADER_BYTES_PATTERN.match(mm, prev_start):
+            return prev_start
+        scan = prev_start - 1
+    return None
+
+
+def iter_url_lines(path, start=0, end=None, show_progress=True):
+    """Yield (line_num, line) for lines containing a URL using a memory-mapped scan
+
+    A URL on a continuation line is preceded by its message's header line so
+    the consumer can attach the right sender and timestamp.
+    """
+    from tqdm import tqdm
+
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        end = size if end is None else end
+        with (
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+            tqdm(
+                total=end - start,
+                unit="B",
+                unit_scale=True,
+                desc="Scanning chat",
+                disable=not show_progress,
+            ) as progress,
+        ):
+            line_num = 1
+            pos = start
+            while match := URL_BYTES_PATTERN.search(mm, pos, end):
+                line_start = mm.rfind(b"\n", pos, match.start()) + 1 or pos
+                if not HEADER_BYTES_PATTERN.match(mm, line_start):
+                    header_start = find_header_start(mm, pos, line_start)
+                    if header_start is not None:
+                        header_end = mm.find(b"\n", header_start, line_start)
+                        line_num += mm[pos:header_start].count(b"\n")
+                        yield (
+                            line_num,
+                            mm[header_start:header_end].decode(
+                                "utf-8", errors="replace"
+                            ),
+                        )
+                        progress.update(header_end - pos)
+                        pos = header_end
+                line_end = mm.find(b"\n", match.end(), end)
+                if line_end == -1:
+                    line_end = end
+                line_num += mm[pos:line_start].count(b"\n")
+                yield (
+                    line_num,
+                    mm[line_start:line_end].decode("utf-8", errors="replace"),
+                )
+                progress.update(line_end - pos)
+                pos = line_end
+            progress.update(end - pos)
+
+
+def find_shard_bounds(path, shards):
+    """Split a file into byte ranges that start on message header lines"""
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return []
+        bounds = [0]
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(1, shards):
+                newline = mm.find(b"\n", max(size * i // shards, bounds[-1]))
+                if newline == -1:
+                    break
+                header = HEADER_BYTES_PATTERN.search(mm, newline + 1)
+                if not header:
+                    break
+                if header.start() > bounds[-1]:
+                    bounds.append(header.start())
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def process_pool(max_workers):
+    """Create a process pool whose workers do not fork the threaded parent"""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+    )
+
+
+def parse_shard(path, start, end, datetime_format=None):
+    """Parse one byte range of the chat file in a worker process"""
+    failed_lines = []
+    cache_before = parse_datetime_cached.cache_info()
+    batch_before = dict(BATCH_DATETIME_CACHE_STATS)
+    entries = list(
+        iter_chat_entries(
+            iter_url_lines(path, start, end, show_progress=False),
+            failed_lines,
+            datetime_format,
+        )
+    )
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        newlines = mm[start:end].count(b"\n")
+    cache_after = parse_datetime_cached.cache_info()
+    cache_stats = {
+        "hits": cache_after.hits
+        - cache_before.hits
+        + BATCH_DATETIME_CACHE_STATS["hits"]
+        - batch_before["hits"],
+        "misses": cache_after.misses
+        - cache_before.misses
+        + BATCH_DATETIME_CACHE_STATS["misses"]
+        - batch_before["misses"],
+    }
+    return entries, failed_lines, newlines, cache_stats
+
+
+def iter_chat_urls_parallel(
+    path,
+    failed_lines,
+    workers=PARSE_WORKERS,
+    datetime_format=None,
+    shard_bytes=PARALLEL_SHARD_BYTES,
+):
+    """Parse shards of the chat file across processes and yield entries in file order"""
+    from tqdm import tqdm
+
+    shards = find_shard_bounds(
+        path, max(workers, -(-os.path.getsize(path) // shard_bytes))
+    )
+    if not shards:
+        return
+    line_offset = 0
+    remaining = iter(shards)
+    pending = deque()
+    with (
+        process_pool(workers) as executor,
+        tqdm(total=len(shards), desc="Parsing shards") as progress,
+    ):
+
+        def submit(count):
+            for start, end in itertools.islice(remaining, count):
+                pending.append(
+                    executor.submit(parse_shard, path, start, end, datetime_format)
+                )
+
+        submit(workers * SHARDS_IN_FLIGHT_PER_WORKER)
+        while pending:
+            entries, shard_failed, newlines, cache_stats = pending.popleft().result()
+            # Only submit another shard as one is consumed, so a slow consumer
+            # holds back parsing instead of letting parsed shards pile up
+            submit(1)
+            progress.update()
+            for key, count in cache_stats.items():
+                WORKER_DATETIME_CACHE_STATS[key] += count
+            for fail in shard_failed:
+                fail["line_num"] += line_offset
+                failed_lines.append(fail)
+            for entry in entries:
+                entry["line_num"] += line_offset
+                yield entry
+            line_offset += newlines
+
+
+def iter_chat_urls(
+    numbered_lines, failed_lines, datetime_format=None, parse_dates=True
+):
+    """Stream URL entries from (line_num, line) pairs one line at a time
+
+    Lines without a header continue the current message and inherit its
+    sender and timestamp; such entries are flagged with ``continuation``.
+    """
+    current = None
+    for line_num, line in numbered_lines:
+        line = line.strip()
+        if not line:
+            continue
+        header = HEADER_PARSER.parse(line)
+        if header:
+            current = header
+            date_str, time_str, sender, message = header
+        elif HEADER_PARSER.is_message_start(line):
+            # System notices end the previous message
+            current = None
+            continue
+        elif current:
+            date_str, time_str, sender, _ = current
+            message = line
+        else:
+            continue
+        links = HEADER_PARSER.find_urls(message)
+        if not links:
+            continue
+        dt = None
+        if parse_dates:
+            try:
+                dt = parse_datetime_cached(date_str, time_str, datetime_format)
+            except ValueError as e:
+                failed_lines.append(
+                    {"line_num": line_num, "error": str(e), "line": truncate_line(line)}
+                )
+                continue
+        for url in links:
+            entry = {
+                "url": url,
+                "sender": sender.strip(),
+                "datetime": dt,
+                "line_num": line_num,
+                "original_line": truncate_line(line),
+                "continuation": header is None,
+            }
+            if not parse_dates:
+                entry["date_str"], entry["time_str"] = date_str, time_str
+            yield entry
+
+
+def parse_datetime_batch(batch, failed_lines, datetime_format):
+    """Convert a batch of raw date/time strings with one pd.to_datetime call"""
+    import pandas as pd
+
+    raw = pd.Series(
+        [f"{entry.pop('date_str')} {entry.pop('time_str')}" for entry in batch],
+        dtype="object",
+    )
+    # Busy chats repeat timestamps, so each distinct value is looked up once in
+    # the cache and only the values it has not seen are normalized and parsed
+    codes, uniques = pd.factorize(raw)
+    resolved = [None] * len(uniques)
+    missing = []
+    for i, value in enumerate(uniques):
+        key = (value, datetime_format)
+        if key in BATCH_DATETIME_CACHE:
+            BATCH_DATETIME_CACHE.move_to_end(key)
+            resolved[i] = BATCH_DATETIME_CACHE[key]
+        else:
+            missing.append(i)
+    BATCH_DATETIME_CACHE_STATS["hits"] += len(uniques) - len(missing)
+    if missing:
+        values = (
+            pd.Series([uniques[i] for i in missing], dtype="object")
+            .str.replace(r"[\u202f\u00a0\u2009\u200a\s]+", " ", regex=True)
+            .str.strip()
+            .str.replace(r"(\d)([apAP][mM])", r"\1 \2", regex=True)
+            .str.lower()
+        )
+        parsed = pd.to_datetime(values, format=datetime_format, errors="coerce")
+        for i, dt in zip(missing, parsed):
+            value = uniques[i]
+            if pd.isna(dt):
+                # Values the detected format cannot handle take the full search
+                date_str, time_str = value.split(" ", 1)
+                try:
+                    dt = parse_datetime_cached(date_str, time_str)
+                except ValueError as e:
+                    dt = e
+            else:
+                # Fallbacks above are counted by the LRU itself
+                BATCH_DATETIME_CACHE_STATS["misses"] += 1
+                dt = dt.to_pydatetime()
+            resolved[i] = dt
+            BATCH_DATETIME_CACHE[(value, datetime_format)] = dt
+        while len(BATCH_DATETIME_CACHE) > DATETIME_CACHE_SIZE:
+            BATCH_DATETIME_CACHE.popitem(last=False)
+    failed_line_num = None
+    for entry, code in zip(batch, codes):
+        dt = resolved[code]
+        if isinstance(dt, ValueError):
+            if entry["line_num"] != failed_line_num:
+                failed_line_num = entry["line_num"]
+                failed_lines.append(
+                    {
+                        "line_num": entry["line_num"],
+                        "error": str(dt),
+                        "line": entry["original_line"],
+                    }
+                )
+            continue
+        entry["datetime"] = dt
+        yield entry
+
+
+def iter_chat_entries(
+    numbered_lines,
+    failed_lines,
+    datetime_format=None,
+    first_batch_size=DATETIME_BATCH_SIZE,
+):
+    """Stream URL entries, converting timestamps in vectorized batches when possible
+
+    Batches start at ``first_batch_size`` and double up to DATETIME_BATCH_SIZE,
+    so a small first batch gets entries to a consumer early without paying
+    per-call overhead on every batch of a large file.
+    """
+    if not datetime_format:
+        yield from iter_chat_urls(numbered_lines, failed_lines)
+        return
+    entries = iter_chat_urls(numbered_lines, failed_lines, parse_dates=False)
+    batch_size = min(first_batch_size, DATETIME_BATCH_SIZE)
+    while batch := list(itertools.islice(entries, batch_size)):
+        yield from parse_datetime_batch(batch, failed_lines, datetime_format)
+        batch_size = min(batch_size * 2, DATETIME_BATCH_SIZE)
+
+
+def canonicalize_url(url):
+    """Normalize a URL so different spellings of the same link share one fetch"""
+    url = url.rstrip(".,;:!?'\"")
+    while url.endswith(")") and url.count(")") > url.count("("):
+        url = url[:-1]
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        userinfo = parts.username
+        if parts.password:
+            userinfo += f":{parts.password}"
+        host = f"{userinfo}@{host}"
+    # Filter raw query segments so the remaining parameters keep their encoding
+    query = "&".join(
+        segment
+        for segment in parts.query.split("&")
+        if segment
+        and (key := segment.split("=", 1)[0].lower()) not in TRACKING_PARAMS
+        and not key.startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path or ("/" if scheme in DEFAULT_PORTS else "")
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class MetadataCache:
+    """SQLite-backed cache of page metadata keyed by canonical URL"""
+
+    def __init__(
+        self,
+        path=METADATA_CACHE_FILE,
+        ttl=METADATA_CACHE_TTL,
+        max_age=METADATA_CACHE_MAX_AGE,
+        max_entries=METADATA_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.revalidated = 0
+        self.revalidated_bytes = 0
+        self.revalidated_parse_seconds = 0.0
+        self.uncommitted = 0
+        self.last_commit = time.monotonic()
+        self.conn = sqlite3.connect(path)
+        if (
+            self.conn.execute("PRAGMA user_version").fetchone()[0]
+            != METADATA_CACHE_SCHEMA_VERSION
+        ):
+            # Cache contents are disposable, so an old layout is simply rebuilt
+            self.conn.execute("DROP TABLE IF EXISTS metadata")
+            self.conn.execute(f"PRAGMA user_version = {METADATA_CACHE_SCHEMA_VERSION}")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metadata (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                description TEXT,
+                status INTEGER,
+                fetched_at REAL,
+                expires_at REAL,
+                body_bytes INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                parse_seconds REAL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS metadata_fetched_at ON metadata (fetched_at)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """Return cached (title, description) if fresh, else None"""
+        row = self.conn.execute(
+            "SELECT title, description, status, body_bytes FROM metadata "
+            "WHERE url = ? AND expires_at > ?",
+            (url, time.time()),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if row[2] != 200:
+            self.negative_hits += 1
+        self.bytes_saved += row[3] or 0
+        return row[0], row[1]
+
+    def get_validators(self, url):
+        """Return (etag, last_modified) of an expired successful entry, else None"""
+        row = self.conn.execute(
+            "SELECT etag, last_modified FROM metadata WHERE url = ? AND status = 200",
+            (url,),
+        ).fetchone()
+        if row is None or not (row[0] or row[1]):
+            return None
+        return row
+
+    def revalidate(self, url, ttl=None):
+        """Extend an entry after a 304 and return its cached (title, description)"""
+        row = self.conn.execute(
+            "SELECT title, description, body_bytes, parse_seconds FROM metadata "
+            "WHERE url = ?",
+            (url,),
+        ).fetchone()
+        now = time.time()
+        self.conn.execute(
+            "UPDATE metadata SET fetched_at = ?, expires_at = ? WHERE url = ?",
+            (now, now + (self.ttl if ttl is None else ttl), url),
+        )
+        self.revalidated += 1
+        self.revalidated_bytes += row[2] or 0
+        self.revalidated_parse_seconds += row[3] or 0.0
+        self.wrote()
+        return row[0], row[1]
+
+    def set(
+        self,
+        url,
+        title,
+        description,
+        status,
+        body_bytes=0,
+        ttl=None,
+        etag=None,
+        last_modified=None,
+        parse_seconds=0.0,
+    ):
+        """Store metadata for a URL, optionally with its own TTL and validators"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO metadata (url, title, description, status, "
+            "fetched_at, expires_at, body_bytes, etag, last_modified, parse_seconds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                title,
+                description,
+                status,
+                now,
+                expires_at,
+                body_bytes,
+                etag,
+                last_modified,
+                parse_seconds,
+            ),
+        )
+        self.wrote()
+
+    def wrote(self):
+        """Count a write and commit once enough writes or time have built up"""
+        # Small batches keep inserts cheap, but a crash loses at most one batch
+        # and the database write lock is not held for the whole run
+        self.uncommitted += 1
+        if (
+            self.uncommitted >= METADATA_CACHE_COMMIT_EVERY
+            or time.monotonic() - self.last_commit >= METADATA_CACHE_COMMIT_SECONDS
+        ):
+            self.conn.commit()
+            self.uncommitted = 0
+            self.last_commit = time.monotonic()
+
+    def evict(self):
+        """Drop entries past max_age, then the oldest beyond max_entries"""
+        self.conn.execute(
+            "DELETE FROM metadata WHERE fetched_at < ?", (time.time() - self.max_age,)
+        )
+        self.conn.execute(
+            "DELETE FROM metadata WHERE url IN ("
+            "SELECT url FROM metadata ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self):
+        """Evict stale entries and persist the cache"""
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+
+async def fetch_title_description(
+    session, url, scheduler, metadata_cache=None, parse_executor=None
+):
+    """Fetch title and description for a canonical URL, coalescing duplicate calls"""
+    # Check caches first
     if url in FETCH_CACHE:
         return FETCH_CACHE[url]
+    if metadata_cache is not None:
+        cached = metadata_cache.get(url)
+        if cached is not None:
+            FETCH_CACHE[url] = cached
+            return cached
+
+    # Join a fetch already in flight instead of issuing another request
+    task = INFLIGHT_FETCHES.get(url)
+    if task is None:
+        task = asyncio.ensure_future(
+            fetch_page_metadata(session, url, scheduler, metadata_cache, parse_executor)
+        )
+        INFLIGHT_FETCHES[url] = task
+        task.add_done_callback(lambda _: INFLIGHT_FETCHES.pop(url, None))
+    # Shield so one cancelled caller does not abort the fetch for the others
+    return await asyncio.shield(task)
+
+
+def classify_http_failure(status):
+    """Map a non-200 HTTP status to a negative cache class"""
+    if status in (404, 410):
+        return "not_found"
+    if status == 429:
+        return "rate_limited"
+    if 400 <= status < 500:
+        return "client_error"
+    return "server_error"
+
+
+def cache_failure(url, result, failure, metadata_cache=None, status=0):
+    """Remember a failed fetch so dead links are not retried until their TTL ends"""
+    FETCH_CACHE[url] = result
+    if metadata_cache is not None:
+        metadata_cache.set(url, *result, status, ttl=NEGATIVE_CACHE_TTLS[failure])
+    return result
+
+
+def format_size(num_bytes):
+    """Format a byte count for display"""
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def is_html_response(response):
+    """Check the Content-Type header; a missing type is treated as HTML"""
+    content_type = response.content_type
+    return (
+        not response.headers.get("Content-Type") or content_type in HTML_CONTENT_TYPES
+    )
+
+
+def describe_non_html(url, response):
+    """Build a title/description for a non-HTML resource without reading its body"""
+    filename = None
+    if response.content_disposition:
+        filename = response.content_disposition.filename
+    if not filename:
+        path = urlparse(url).path.rstrip("/")
+        filename = path.rsplit("/", 1)[-1] or urlparse(url).netloc
+    details = response.content_type
+    if response.content_length is not None:
+        details += f", {format_size(response.content_length)}"
+    return f"{filename} ({details})", f"Non-HTML resource: {details}"
 
+
+async def read_html_head(response, max_bytes=MAX_HTML_BYTES):
+    """Stream the response body until </head> or max_bytes, whichever comes first"""
+    buffer = bytearray()
+    search_from = 0
+    async for chunk in response.content.iter_chunked(HTML_CHUNK_SIZE):
+        buffer += chunk
+        match = HEAD_END_PATTERN.search(buffer, search_from)
+        if match:
+            return bytes(buffer[: match.end()])
+        if len(buffer) >= max_bytes:
+            return bytes(buffer[:max_bytes])
+        # A </head> split across chunks, however much whitespace it holds, can
+        # only start at the last "<" read so far
+        last_open = buffer.rfind(b"<", search_from)
+        search_from = last_open if last_open != -1 else len(buffer)
+    return bytes(buffer)
+
+
+def decode_html(body, charset=None):
+    """Decode an HTML prefix using the header charset or a <meta charset> hint"""
+    if not charset:
+        match = META_CHARSET_PATTERN.search(body)
+        charset = match.group(1).decode("ascii") if match else "utf-8"
     try:
-        # Clean URL
-        url = url.rstrip(".,;!?")
-        parsed = urlparse(url)
-        if not parsed.scheme or not parsed.netloc:
-            return "Invalid URL", "Invalid URL format"
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
 
-        async with semaphore:
-            async with async_timeout.timeout(15):
-                async with session.get(url, headers=HEADERS) as response:
-                    if response.status != 200:
-                        return (
-                            f"HTTP Error {response.status}",
-                            f"HTTP error occurred: {response.status}",
-                        )
-                    text = await response.text()
 
-        soup = BeautifulSoup(text, "html.parser")
+class HeadParsed(Exception):
+    """Raised to stop HeadMetadataParser once </head> has been seen"""
+
+
+class HeadMetadataParser(HTMLParser):
+    """Collect <title> and title/description <meta> tags, stopping at </head>"""
+
+    # (attribute, value) pairs for description tags, in order of preference
+    DESCRIPTION_KEYS = (
+        ("name", "description"),
+        ("property", "og:description"),
+        ("name", "Description"),
+    )
+    # Elements without end tags, which never hold children
+    VOID_TAGS = frozenset(
+        {
+            "area",
+            "base",
+            "br",
+            "col",
+            "embed",
+            "hr",
+            "img",
+            "input",
+            "link",
+            "meta",
+            "param",
+            "source",
+            "track",
+            "wbr",
+        }
+    )
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Child nodes of the first <title>, as ("text" | "string", value) or
+        # ("tag", name, children), and the open elements inside it
+        self.title_nodes = None
+        self.title_stack = []
+        self.og_title = None
+        self.descriptions = {}
+
+    def add_title_node(self, kind, value):
+        nodes = self.title_stack[-1]
+        if kind == "text" and nodes and nodes[-1][0] == "text":
+            nodes[-1] = ("text", nodes[-1][1] + value)
+        else:
+            nodes.append((kind, value))
+
+    def handle_starttag(self, tag, attrs):
+        if self.title_stack:
+            children = []
+            self.title_stack[-1].append(("tag", tag, children))
+            if tag not in self.VOID_TAGS:
+                self.title_stack.append(children)
+        elif tag == "title" and self.title_nodes is None:
+            self.title_nodes = []
+            self.title_stack = [self.title_nodes]
+        if tag == "meta":
+            attrs = dict(attrs)
+            if self.og_title is None and attrs.get("property") == "og:title":
+                self.og_title = attrs
+            for key in self.DESCRIPTION_KEYS:
+                if key not in self.descriptions and attrs.get(key[0]) == key[1]:
+                    self.descriptions[key] = attrs
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.title_stack = []
+        elif tag == "head":
+            raise HeadParsed
+        elif len(self.title_stack) > 1:
+            parent = self.title_stack[-2]
+            if parent[-1][0] == "tag" and parent[-1][1] == tag:
+                self.title_stack.pop()
+
+    def handle_data(self, data):
+        if self.title_stack:
+            self.add_title_node("text", data)
 
-        # Extract title
+    # Comments, CDATA, declarations and processing instructions inside the title
+    # are child strings of their own, as BeautifulSoup treated them
+    def handle_comment(self, data):
+        if self.title_stack:
+            self.add_title_node("string", data)
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    @staticmethod
+    def single_string(nodes):
+        """Return the text of a lone child string, descending through lone tags"""
+        if len(nodes) != 1:
+            return None
+        node = nodes[0]
+        if node[0] == "tag":
+            return HeadMetadataParser.single_string(node[2])
+        return node[1]
+
+    def result(self):
+        """Return (title, description) using the same precedence as before"""
         title = "N/A"
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
-        elif soup.find("meta", attrs={"property": "og:title"}):
-            title = (
-                soup.find("meta", attrs={"property": "og:title"})
-                .get("content", "N/A")
-                .strip()
-            )
+        title_text = self.single_string(self.title_nodes or [])
+        if title_text:
+            title = title_text.strip()
+        elif self.og_title is not None:
+            title = (self.og_title.get("content", "N/A") or "").strip()
 
-        # Extract description
         description = "N/A"
-        desc_tag = (
-            soup.find("meta", attrs={"name": "description"})
-            or soup.find("meta", attrs={"property": "og:description"})
-            or soup.find("meta", attrs={"name": "Description"})
+        for key in self.DESCRIPTION_KEYS:
+            if key in self.descriptions:
+                content = self.descriptions[key].get("content")
+                if content:
+                    description = content.strip()
+                break
+
+        return title, description
+
+
+def parse_page_metadata(text):
+    """Extract title and description from an HTML page"""
+    parser = HeadMetadataParser()
+    try:
+        parser.feed(text)
+        parser.close()
+    except HeadParsed:
+        pass
+    return parser.result()
+
+
+class AdaptiveLimit:
+    """Concurrency limit that grows additively and shrinks multiplicatively"""
+
+    def __init__(self, initial, maximum, minimum=1):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.peak = float(initial)
+        self.decreases = 0
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.acquired = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.acquired += 1
+
+    async def release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def increase(self):
+        """Add roughly one slot per limit's worth of healthy responses"""
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self.peak = max(self.peak, self.limit)
+
+    def decrease(self):
+        """Halve the limit, at most once per cooldown so a burst counts once"""
+        now = time.monotonic()
+        if now - self.last_decrease < AIMD_COOLDOWN_SECONDS:
+            return
+        self.last_decrease = now
+        self.limit = max(self.minimum, self.limit * AIMD_DECREASE)
+        self.decreases += 1
+
+
+def url_host(url):
+    """Return the lowercased host a URL's fetch slots are keyed on"""
+    return (urlparse(url).hostname or "").lower()
+
+
+class FetchScheduler:
+    """Adapt concurrent fetch limits globally and per host from response health"""
+
+    def __init__(
+        self,
+        max_concurrent=MAX_CONCURRENT_FETCHES,
+        max_per_host=MAX_FETCHES_PER_HOST,
+        initial_concurrent=INITIAL_CONCURRENT_FETCHES,
+        initial_per_host=INITIAL_FETCHES_PER_HOST,
+    ):
+        self.max_per_host = max_per_host
+        self.initial_per_host = min(initial_per_host, max_per_host)
+        self.global_limit = AdaptiveLimit(
+            min(initial_concurrent, max_concurrent), max_concurrent
+        )
+        self.host_limits = {}
+        # Awaited with the URL each time a slot is released
+        self.on_release = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        """Hold a host slot, then a global slot, and learn from the outcome
+
+        Yields a dict the caller fills with the response ``status``.
+        """
+        import aiohttp
+
+        host = url_host(url)
+        host_limit = self.host_limits.get(host)
+        if host_limit is None:
+            host_limit = AdaptiveLimit(self.initial_per_host, self.max_per_host)
+            self.host_limits[host] = host_limit
+        # Queue on the host first so a busy host does not tie up global slots
+        await host_limit.acquire()
+        await self.global_limit.acquire()
+        started = time.perf_counter()
+        outcome = {"status": None}
+        overloaded = unreachable = False
+        try:
+            yield outcome
+        except asyncio.TimeoutError:
+            overloaded = True
+            raise
+        except aiohttp.ClientConnectionError:
+            unreachable = True
+            raise
+        finally:
+            if overloaded or outcome["status"] in OVERLOAD_STATUSES:
+                host_limit.decrease()
+                self.global_limit.decrease()
+            elif unreachable:
+                # A dead host says nothing about overall capacity
+                host_limit.decrease()
+            elif (
+                outcome["status"] is not None
+                and outcome["status"] < 400
+                and time.perf_counter() - started < SLOW_FETCH_SECONDS
+            ):
+                # Only fast successes and redirects count as healthy; errors hold steady
+                host_limit.increase()
+                self.global_limit.increase()
+            await self.global_limit.release()
+            await host_limit.release()
+            if self.on_release is not None:
+                await self.on_release(url)
+
+    def host_capacity(self, host):
+        """Return how many fetches ``host`` may currently have in flight"""
+        host_limit = self.host_limits.get(host)
+        return int(host_limit.limit) if host_limit else self.initial_per_host
+
+    def metrics(self):
+        """Return the current limits for progress display and the run summary"""
+        return {
+            "global_limit": int(self.global_limit.limit),
+            "global_peak": int(self.global_limit.peak),
+            "in_flight": self.global_limit.in_flight,
+            "hosts": len(self.host_limits),
+            "hosts_backed_off": sum(
+                1 for limit in self.host_limits.values() if limit.decreases
+            ),
+        }
+
+    def host_metrics(self, top=SUMMARY_TOP_HOSTS):
+        """Return current and peak limits for the most backed-off, busiest hosts"""
+        ranked = sorted(
+            self.host_limits.items(),
+            key=lambda item: (item[1].decreases, item[1].acquired),
+            reverse=True,
+        )
+        return [
+            {
+                "host": host,
+                "limit": int(limit.limit),
+                "peak": int(limit.peak),
+                "requests": limit.acquired,
+                "backoffs": limit.decreases,
+            }
+            for host, limit in ranked[:top]
+        ]
+
+
+class HostDispatchQueue:
+    """Bounded URL queue that hands workers URLs whose host has a free slot
+
+    With a plain FIFO, a run of URLs for one busy host parks every worker on
+    that host's few slots while URLs for other hosts wait behind them. Here
+    URLs for a saturated host wait in a per-host deque and ``get`` returns the
+    oldest URL whose host can start a fetch now.
+    """
+
+    def __init__(self, scheduler, maxsize):
+        self.scheduler = scheduler
+        self.maxsize = maxsize
+        self.hosts = {}
+        # Host of each handed-out URL until its first fetch attempt releases its
+        # slot, so responses still being parsed do not hold back the next URL
+        self.dispatched = {}
+        self.active = Counter()
+        self.queued = 0
+        self.unfinished = 0
+        self.sequence = itertools.count()
+        lock = asyncio.Lock()
+        self.ready = asyncio.Condition(lock)
+        self.space = asyncio.Condition(lock)
+        self.idle = asyncio.Condition(lock)
+        scheduler.on_release = self.release
+
+    def ready_host(self):
+        """Return the host holding the oldest URL that may start now, if any"""
+        best = None
+        for host, urls in self.hosts.items():
+            if self.active[host] < self.scheduler.host_capacity(host) and (
+                best is None or urls[0][0] < self.hosts[best][0][0]
+            ):
+                best = host
+        return best
+
+    def has_space(self):
+        # Past maxsize, only admit more while nothing queued can be dispatched
+        return self.queued < self.maxsize or (
+            self.queued < FETCH_DEFERRED_MAX and self.ready_host() is None
+        )
+
+    async def put(self, url):
+        async with self.space:
+            await self.space.wait_for(self.has_space)
+            host = url_host(url)
+            self.hosts.setdefault(host, deque()).append((next(self.sequence), url))
+            self.queued += 1
+            self.unfinished += 1
+            self.ready.notify()
+
+    async def get(self):
+        async with self.ready:
+            while (host := self.ready_host()) is None:
+                await self.ready.wait()
+            urls = self.hosts[host]
+            _, url = urls.popleft()
+            if not urls:
+                del self.hosts[host]
+            self.queued -= 1
+            self.dispatched[url] = host
+            self.active[host] += 1
+            # Pass the wakeup on if more work can start, and let the producer refill
+            if self.ready_host() is not None:
+                self.ready.notify()
+            self.space.notify()
+            return url
+
+    async def release(self, url):
+        """Free the host's dispatch slot taken by ``url``, if it still holds one"""
+        async with self.ready:
+            host = self.dispatched.pop(url, None)
+            if host is None:
+                return
+            self.active[host] -= 1
+            self.ready.notify()
+            self.space.notify()
+
+    async def task_done(self, url):
+        await self.release(url)
+        async with self.idle:
+            self.unfinished -= 1
+            if not self.unfinished:
+                self.idle.notify_all()
+
+    async def join(self):
+        async with self.idle:
+            await self.idle.wait_for(lambda: not self.unfinished)
+
+
+def parse_page_metadata_timed(text):
+    """Parse page metadata and return (title, description, seconds spent)"""
+    started = time.perf_counter()
+    title, description = parse_page_metadata(text)
+    return title, description, time.perf_counter() - started
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a periodic timer"""
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        self.task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def summary(self):
+        """Return a one-line description of the observed lag"""
+        mean = self.total_lag / self.samples if self.samples else 0.0
+        return (
+            f"mean {mean * 1000:.1f} ms, max {self.max_lag * 1000:.1f} ms "
+            f"over {self.samples} samples"
+        )
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a Retry-After header, if any"""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_delay(attempt, deadline, retry_after=None):
+    """Return how long to wait before retrying, or None to give up"""
+    if attempt >= FETCH_MAX_ATTEMPTS:
+        return None
+    delay = parse_retry_after(retry_after)
+    if delay is None:
+        # Full jitter keeps retries from many URLs from landing together
+        delay = random.uniform(
+            0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
         )
-        if desc_tag and desc_tag.get("content"):
-            description = desc_tag["content"].strip()
+    if time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+async def fetch_page_metadata(
+    session, url, scheduler, metadata_cache=None, parse_executor=None
+):
+    """Download a page and extract its title and description"""
+    import aiohttp
+    import async_timeout
+
+    try:
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return cache_failure(
+                url, ("Invalid URL", "Invalid URL format"), "invalid", metadata_cache
+            )
+
+        # Revalidate an expired entry instead of downloading it again
+        headers = HEADERS
+        validators = metadata_cache.get_validators(url) if metadata_cache else None
+        if validators:
+            etag, last_modified = validators
+            headers = dict(HEADERS)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        deadline = time.monotonic() + FETCH_DEADLINE_SECONDS
+        delay = 0
+        for attempt in itertools.count(1):
+            # Back off outside the scheduler so sleeping retries hold no slot
+            if delay:
+                await asyncio.sleep(delay)
+            queued_at = time.monotonic()
+            try:
+                async with scheduler.slot(url) as outcome:
+                    # Waiting behind a busy host is not the server's fault, so
+                    # queueing time does not count against the deadline
+                    deadline += time.monotonic() - queued_at
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return (
+                            "Deadline Exceeded",
+                            "Gave up before the request could be sent",
+                        )
+                    async with (
+                        async_timeout.timeout(min(FETCH_TIMEOUT, remaining)),
+                        session.get(url, headers=headers) as response,
+                    ):
+                        outcome["status"] = response.status
+                        if response.status in RETRY_STATUSES:
+                            delay = retry_delay(
+                                attempt,
+                                deadline,
+                                response.headers.get("Retry-After"),
+                            )
+                            if delay is not None:
+                                continue
+                        if response.status == 304 and validators:
+                            result = metadata_cache.revalidate(url)
+                            FETCH_CACHE[url] = result
+                            return result
+                        if response.status != 200:
+                            return cache_failure(
+                                url,
+                                (
+                                    f"HTTP Error {response.status}",
+                                    f"HTTP error occurred: {response.status}",
+                                ),
+                                classify_http_failure(response.status),
+                                metadata_cache,
+                                response.status,
+                            )
+                        if not is_html_response(response):
+                            result = describe_non_html(url, response)
+                            FETCH_CACHE[url] = result
+                            if metadata_cache is not None:
+                                metadata_cache.set(url, *result, 200)
+                            return result
+                        body = await read_html_head(response)
+                        text = decode_html(body, response.charset)
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                break
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                delay = retry_delay(attempt, deadline)
+                if delay is None:
+                    raise
+
+        if parse_executor is not None:
+            (
+                title,
+                description,
+                parse_seconds,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                parse_executor, parse_page_metadata_timed, text
+            )
+        else:
+            title, description, parse_seconds = parse_page_metadata_timed(text)
 
         # Cache the result
         FETCH_CACHE[url] = (title, description)
+        if metadata_cache is not None:
+            metadata_cache.set(
+                url,
+                title,
+                description,
+                200,
+                len(body),
+                etag=etag,
+                last_modified=last_modified,
+                parse_seconds=parse_seconds,
+            )
         return title, description
 
     except asyncio.TimeoutError:
-        return "Timeout Error", "Request timed out"
+        return cache_failure(
+            url, ("Timeout Error", "Request timed out"), "timeout", metadata_cache
+        )
     except aiohttp.ClientConnectionError:
-        return "Connection Error", "Failed to connect to URL"
+        return cache_failure(
+            url,
+            ("Connection Error", "Failed to connect to URL"),
+            "connection",
+            metadata_cache,
+        )
     except Exception as e:
-        return "Fetch Error", f"Error: {str(e)[:100]}..."
-
-
-async def fetch_all_urls(urls_data, max_concurrent=10):
-    """Fetch titles and descriptions for all URLs concurrently"""
-    semaphore = asyncio.Semaphore(max_concurrent)
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for url_data in urls_data:
-            tasks.append(fetch_title_description(session, url_data["url"], semaphore))
-        results = []
-        for task, url_data in tqdm(
-            zip(asyncio.as_completed(tasks), urls_data),
-            total=len(urls_data),
-            desc="Fetching URLs",
+        return cache_failure(
+            url, ("Fetch Error", f"Error: {str(e)[:100]}..."), "error", metadata_cache
+        )
+
+
+def build_result_row(url_data, title, description):
+    """Build one output row for a URL occurrence"""
+    return {
+        "Sender": url_data["sender"],
+        "Date": url_data["datetime"].date(),
+        "URL": url_data["url"],
+        "Title": title,
+        "Description": description,
+        "Time": url_data["datetime"].time(),
+        "Line_Number": url_data["line_num"],
+        "Original_Line": url_data["original_line"],
+    }
+
+
+async def iterate_async(items):
+    """Iterate a sync or async iterable from a coroutine"""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def iter_in_thread(items, chunk_size=PARSE_CHUNK_SIZE):
+    """Run a blocking iterator in a thread and yield its items on the event loop"""
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue(maxsize=PARSE_QUEUE_CHUNKS)
+
+    def put(chunk):
+        # Blocks the thread while the queue is full, giving backpressure
+        asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+
+    def produce():
+        try:
+            iterator = iter(items)
+            while chunk := list(itertools.islice(iterator, chunk_size)):
+                put(chunk)
+            put(None)
+        except BaseException as e:
+            put(e)
+
+    threading.Thread(target=produce, name="chat-parser", daemon=True).start()
+    while True:
+        chunk = await chunks.get()
+        if chunk is None:
+            return
+        if isinstance(chunk, BaseException):
+            raise chunk
+        for item in chunk:
+            yield item
+
+
+def tally_entries(entries, stats):
+    """Count URL entries, and those recovered from continuation lines, as they pass"""
+    for entry in entries:
+        stats["urls"] += 1
+        stats["continuation"] += entry["continuation"]
+        yield entry
+
+
+class ExcelStreamWriter:
+    """Write result rows to Excel from a background thread as they arrive
+
+    Rows may arrive in any order; they are written in input order, which for
+    chat exports is chronological. If timestamps turn out to be out of order
+    the sheet is re-sorted by Date and Time before saving.
+    """
+
+    COLUMNS = [
+        "Sender",
+        "Date",
+        "URL",
+        "Title",
+        "Description",
+        "Time",
+        "Line_Number",
+        "Original_Line",
+    ]
+
+    def __init__(self, path=OUTPUT_EXCEL):
+        self.path = path
+        self.queue = queue.Queue()
+        self.rows = []
+        self.in_order = True
+        self.senders = Counter()
+        self.widths = [len(column) for column in self.COLUMNS]
+        self.error = None
+        self.workbook = self.worksheet = None
+        self.thread = threading.Thread(
+            target=self.run, name="excel-writer", daemon=True
+        )
+        self.thread.start()
+
+    def put(self, index, row):
+        self.queue.put((index, row))
+
+    def open_sheet(self):
+        """Create the workbook and its header row"""
+        import openpyxl
+        from openpyxl.styles import Font
+
+        self.workbook = openpyxl.Workbook()
+        self.worksheet = self.workbook.active
+        self.worksheet.title = "Links"
+        self.worksheet.append(self.COLUMNS)
+        for cell in self.worksheet[1]:
+            cell.font = Font(bold=True)
+
+    def run(self):
+        buffered = {}
+        next_index = 0
+        try:
+            while (item := self.queue.get()) is not None:
+                # openpyxl is only loaded once there is a row to write
+                if self.workbook is None:
+                    self.open_sheet()
+                index, row = item
+                buffered[index] = row
+                while next_index in buffered:
+                    self.write(buffered.pop(next_index))
+                    next_index += 1
+        except Exception as e:
+            self.error = e
+
+    def write(self, row):
+        values = [row[column] for column in self.COLUMNS]
+        if self.rows and (row["Date"], row["Time"]) < (
+            self.rows[-1]["Date"],
+            self.rows[-1]["Time"],
         ):
-            title, description = await task
-            results.append(
-                {
-                    "Sender": url_data["sender"],
-                    "Date": url_data["datetime"].date(),
-                    "URL": url_data["url"],
-                    "Title": title,
-                    "Description": description,
-                    "Time": url_data["datetime"].time(),
-                    "Line_Number": url_data["line_num"],
-                    "Original_Line": url_data["original_line"],
-                }
+            self.in_order = False
+        self.rows.append(row)
+        self.senders[row["Sender"]] += 1
+        for i, value in enumerate(values):
+            self.widths[i] = max(self.widths[i], len(str(value)))
+        self.worksheet.append(values)
+
+    def close(self, save=True):
+        """Finish writing and, if requested, save the workbook"""
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        if not save:
+            return
+        if self.workbook is None:
+            self.open_sheet()
+        if not self.in_order:
+            self.worksheet.delete_rows(2, len(self.rows))
+            self.rows.sort(key=lambda row: (row["Date"], row["Time"]))
+            for row in self.rows:
+                self.worksheet.append([row[column] for column in self.COLUMNS])
+        from openpyxl.utils import get_column_letter
+
+        for i, width in enumerate(self.widths):
+            letter = get_column_letter(i + 1)
+            self.worksheet.column_dimensions[letter].width = min(width + 2, 50)
+        self.workbook.save(self.path)
+
+
+async def fetch_all_urls(
+    urls_data,
+    max_concurrent=MAX_CONCURRENT_FETCHES,
+    max_per_host=MAX_FETCHES_PER_HOST,
+    metadata_cache=None,
+    parse_workers=HTML_PARSE_WORKERS,
+    on_result=None,
+):
+    """Fetch titles and descriptions once per unique canonical URL
+
+    URL entries are pulled from ``urls_data`` (a sync or async iterable) into a
+    bounded, host-aware queue drained by a fixed pool of worker coroutines, so
+    pending work stays proportional to concurrency and a busy host cannot tie
+    up every worker. When ``on_result(index, row)`` is given,
+    rows are streamed to it as they complete and nothing is returned;
+    otherwise rows are returned in input order.
+    """
+    import aiohttp
+    from tqdm import tqdm
+
+    results = [] if on_result is None else None
+    total = 0
+    # Entries waiting for their row, by index; and those indices by canonical URL
+    waiting = {}
+    pending = {}
+    scheduler = FetchScheduler(max_concurrent, max_per_host)
+    queue = HostDispatchQueue(scheduler, max_concurrent * FETCH_QUEUE_FACTOR)
+    progress = tqdm(desc="Fetching URLs", unit=" urls")
+
+    def emit(index, result):
+        row = build_result_row(waiting.pop(index), *result)
+        if on_result is not None:
+            on_result(index, row)
+        else:
+            results[index] = row
+
+    async def worker(session, scheduler, parse_executor):
+        while True:
+            url = await queue.get()
+            try:
+                result = await fetch_title_description(
+                    session, url, scheduler, metadata_cache, parse_executor
+                )
+            except Exception as e:
+                result = ("Fetch Error", f"Error: {str(e)[:100]}...")
+            for index in pending.pop(url):
+                emit(index, result)
+            metrics = scheduler.metrics()
+            progress.set_postfix(
+                limit=metrics["global_limit"],
+                in_flight=metrics["in_flight"],
+                refresh=False,
             )
-        return results
+            progress.update()
+            await queue.task_done(url)
+
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrent,
+        limit_per_host=max_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    with (
+        process_pool(parse_workers) if parse_workers else contextlib.nullcontext()
+    ) as parse_executor:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            workers = [
+                asyncio.ensure_future(worker(session, scheduler, parse_executor))
+                for _ in range(max_concurrent)
+            ]
+            async for url_data in iterate_async(urls_data):
+                index = total
+                total += 1
+                waiting[index] = url_data
+                if results is not None:
+                    results.append(None)
+                url = canonicalize_url(url_data["url"])
+                if url in pending:
+                    pending[url].append(index)
+                elif url in FETCH_CACHE:
+                    emit(index, FETCH_CACHE[url])
+                else:
+                    pending[url] = [index]
+                    await queue.put(url)
+                if index % FETCH_PRODUCER_YIELD_EVERY == 0:
+                    # Let workers run while a synchronous producer is still going
+                    await asyncio.sleep(0)
+            await queue.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    progress.close()
+    lag_monitor.stop()
+
+    if total:
+        print(
+            f"🔗 {progress.n} unique URLs out of {total} "
+            f"({1 - progress.n / total:.1%} deduplicated)"
+        )
+    metrics = scheduler.metrics()
+    print(
+        f"🎚️  Concurrency: global limit {metrics['global_limit']} "
+        f"(peak {metrics['global_peak']}), "
+        f"{metrics['hosts_backed_off']}/{metrics['hosts']} hosts backed off"
+    )
+    for host in scheduler.host_metrics():
+        print(
+            f"   • {host['host']}: limit {host['limit']} (peak {host['peak']}), "
+            f"{host['requests']} requests, {host['backoffs']} backoffs"
+        )
+    parse_mode = (
+        f"parsing in {parse_workers} worker processes"
+        if parse_workers
+        else "parsing on the event loop"
+    )
+    print(f"⏱️  Event loop lag: {lag_monitor.summary()} ({parse_mode})")
+
+    return results
+
+
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(
+        description="Extract links from a WhatsApp chat export into Excel."
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="skip cosmetic pauses and animations (default when stdout is not a TTY)",
+    )
+    return parser.parse_args(argv)
 
 
-def main():
-    animate_text("🚀 Starting WhatsApp Chat Link Extractor...", 0.03)
-    time.sleep(0.5)
+def main(argv=None):
+    args = parse_args(argv)
+    # Pauses and the typewriter effect are only for people watching a terminal
+    interactive = not args.quiet and sys.stdout.isatty()
 
-    # Read chat file
+    animate_text("🚀 Starting WhatsApp Chat Link Extractor...", 0.03, interactive)
+    if interactive:
+        time.sleep(0.5)
+
+    # Parse, fetch and write as overlapping stages: a parser thread streams URLs
+    # into the fetch workers, whose rows stream into the Excel writer thread
+    print("📝 Parsing chat messages and fetching website information...")
+    failed_lines = []
     try:
-        with open(CHAT_FILE, "r", encoding="utf-8") as file:
-            lines = file.readlines()
+        datetime_format = detect_datetime_format(sample_datetime_strings(CHAT_FILE))
+        if datetime_format:
+            print(f"🕒 Detected date format: {datetime_format}")
+        if os.path.getsize(CHAT_FILE) > PARALLEL_PARSE_THRESHOLD and PARSE_WORKERS > 1:
+            entries = iter_chat_urls_parallel(
+                CHAT_FILE, failed_lines, datetime_format=datetime_format
+            )
+        else:
+            entries = iter_chat_entries(
+                iter_url_lines(CHAT_FILE),
+                failed_lines,
+                datetime_format,
+                first_batch_size=PARSE_CHUNK_SIZE,
+            )
     except FileNotFoundError:
         print(f"❌ Error: '{CHAT_FILE}' not found!")
         return
@@ -177,47 +1805,32 @@ def main():
         print(f"❌ Error reading file: {e}")
         return
 
-    print(f"📁 Found {len(lines)} lines to process")
-    time.sleep(0.5)
-
-    # Parse lines and extract URLs
-    print("📝 Parsing chat messages...")
-    all_urls = []
-    failed_lines = []
+    parse_stats = {"urls": 0, "continuation": 0}
+    writer = ExcelStreamWriter()
+    metadata_cache = MetadataCache()
+    try:
+        asyncio.run(
+            fetch_all_urls(
+                iter_in_thread(tally_entries(entries, parse_stats)),
+                metadata_cache=metadata_cache,
+                on_result=writer.put,
+            )
+        )
+    except Exception as e:
+        writer.close(save=False)
+        print(f"❌ Error processing chat: {e}")
+        return
+    finally:
+        metadata_cache.close()
 
-    for line_num, line in enumerate(tqdm(lines, desc="Parsing lines")):
-        line = line.strip()
-        if not line:
-            continue
-        match = re.match(DATE_PATTERN, line)
-        if match:
-            date_str, time_str, sender, message = match.groups()
-            links = re.findall(URL_PATTERN, message)
-            if links:
-                try:
-                    dt = parse_datetime(date_str, time_str)
-                    for url in links:
-                        all_urls.append(
-                            {
-                                "url": url,
-                                "sender": sender.strip(),
-                                "datetime": dt,
-                                "line_num": line_num + 1,
-                                "original_line": line[:100] + "..."
-                                if len(line) > 100
-                                else line,
-                            }
-                        )
-                except ValueError as e:
-                    failed_lines.append(
-                        {
-                            "line_num": line_num + 1,
-                            "error": str(e),
-                            "line": line[:100] + "..." if len(line) > 100 else line,
-                        }
-                    )
-
-    print(f"\n✅ Found {len(all_urls)} URLs to process")
+    print(
+        f"📁 Scanned {os.path.getsize(CHAT_FILE) / 1024 / 1024:.1f} MB of chat history"
+    )
+    print(f"\n✅ Found {parse_stats['urls']} URLs")
+    if parse_stats["continuation"]:
+        print(
+            f"🧵 Recovered {parse_stats['continuation']} URLs from multi-line messages"
+        )
     if failed_lines:
         print(f"⚠️  {len(failed_lines)} lines couldn't be parsed (saved to debug file)")
         with open("failed_lines.txt", "w", encoding="utf-8") as f:
@@ -226,51 +1839,55 @@ def main():
                 f.write(f"Line {fail['line_num']}: {fail['error']}\n")
                 f.write(f"Content: {fail['line']}\n\n")
 
-    if not all_urls:
+    if not parse_stats["urls"]:
+        writer.close(save=False)
         print("❌ No URLs found in the chat file!")
         return
 
-    time.sleep(0.5)
-
-    # Fetch titles and descriptions asynchronously
-    print("\n🌐 Fetching website information...")
-    entries = asyncio.run(fetch_all_urls(all_urls, max_concurrent=10))
+    if interactive:
+        time.sleep(0.5)
 
     # Export to Excel
     print("\n💾 Exporting to Excel...")
     try:
-        df = pd.DataFrame(entries)
-        df_sorted = df.sort_values(["Date", "Time"])
-        with pd.ExcelWriter(OUTPUT_EXCEL, engine="openpyxl") as writer:
-            df_sorted.to_excel(writer, index=False, sheet_name="Links")
-            worksheet = writer.sheets["Links"]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-
-        print(f"✅ Successfully exported {len(df)} links to '{OUTPUT_EXCEL}'")
+        writer.close()
+        rows = writer.rows
+        dates = [row["Date"] for row in rows]
+        print(f"✅ Successfully exported {len(rows)} links to '{OUTPUT_EXCEL}'")
         print("\n📊 Summary:")
-        print(f"   • Total links processed: {len(df)}")
-        print(f"   • Unique senders: {df['Sender'].nunique()}")
-        print(f"   • Date range: {df['Date'].min()} to {df['Date'].max()}")
-        top_senders = df["Sender"].value_counts().head(3)
+        print(f"   • Total links processed: {len(rows)}")
+        print(f"   • Unique senders: {len(writer.senders)}")
+        print(f"   • Date range: {min(dates)} to {max(dates)}")
         print("   • Top link sharers:")
-        for sender, count in top_senders.items():
+        for sender, count in writer.senders.most_common(3):
             print(f"     - {sender}: {count} links")
+        cache_hits, cache_misses = datetime_cache_stats()
+        if cache_hits + cache_misses:
+            print(
+                f"   • Timestamp cache: {cache_hits} hits, {cache_misses} misses "
+                f"({cache_hits / (cache_hits + cache_misses):.0%} hit rate)"
+            )
+        lookups = metadata_cache.hits + metadata_cache.misses
+        if lookups:
+            print(
+                f"   • Metadata cache: {metadata_cache.hits}/{lookups} hits "
+                f"({metadata_cache.hits / lookups:.0%}), "
+                f"{metadata_cache.bytes_saved / 1024 / 1024:.1f} MB not downloaded"
+            )
+        if metadata_cache.revalidated:
+            print(
+                f"   • Revalidated unchanged pages: {metadata_cache.revalidated} "
+                f"({metadata_cache.revalidated_bytes / 1024 / 1024:.1f} MB and "
+                f"{metadata_cache.revalidated_parse_seconds:.2f}s of parsing saved)"
+            )
+        if metadata_cache.negative_hits:
+            print(f"   • Known-dead links skipped: {metadata_cache.negative_hits}")
 
     except Exception as e:
         print(f"❌ Error exporting to Excel: {e}")
         return
 
-    animate_text("\n🎉 All done! Check your Excel file.", 0.03)
+    animate_text("\n🎉 All done! Check your Excel file.", 0.03, interactive)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""Compare per-page metadata extraction: BeautifulSoup vs HeadMetadataParser
+
+Needs beautifulsoup4 (a dev dependency) for the old extractor:
+
+    python metadata_benchmark.py --pages 2000
+"""
+
+import argparse
+import time
+
+import main
+
+# Synthetic pages: head size grows from a bare page to a heavy, meta-laden one
+PAGE_SHAPES = {
+    "minimal": (3, 0, 0),
+    "typical": (30, 10, 5),
+    "heavy": (300, 40, 20),
+}
+
+
+def bs4_parse_page_metadata(text):
+    """Extract title and description with BeautifulSoup, as main.py used to"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, "html.parser")
+
+    title = "N/A"
+    if soup.title and soup.title.string:
+        title = soup.title.string.strip()
+    elif soup.find("meta", attrs={"property": "og:title"}):
+        title = (
+            soup.find("meta", attrs={"property": "og:title"})
+            .get("content", "N/A")
+            .strip()
+        )
+
+    description = "N/A"
+    desc_tag = (
+        soup.find("meta", attrs={"name": "description"})
+        or soup.find("meta", attrs={"property": "og:description"})
+        or soup.find("meta", attrs={"name": "Description"})
+    )
+    if desc_tag and desc_tag.get("content"):
+        description = desc_tag["content"].strip()
+
+    return title, description
+
+
+def synthetic_page(metas, links, scripts, body_paragraphs=200):
+    """Return a page with the given numbers of head tags and a plain body"""
+    head = ["<meta charset='utf-8'>", "<title>Synthetic page &amp; more</title>"]
+    head += [f"<meta name='keyword{i}' content='value {i}'>" for i in range(metas)]
+    head += [f"<link rel='preload' href='/asset{i}.css'>" for i in range(links)]
+    head += [f"<script>var x{i} = '{i}' < 2;</script>" for i in range(scripts)]
+    head.append("<meta name='description' content='A synthetic description'>")
+    body = "".join(f"<p>Paragraph {i} of the body.</p>" for i in range(body_paragraphs))
+    return f"<html><head>{''.join(head)}</head><body>{body}</body></html>"
+
+
+def time_per_page(extract, text, pages):
+    start = time.perf_counter()
+    for _ in range(pages):
+        extract(text)
+    return (time.perf_counter() - start) / pages
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    print(f"📄 Per-page extraction time, {args.pages} pages per shape")
+    for shape, counts in PAGE_SHAPES.items():
+        text = synthetic_page(*counts)
+        old, new = bs4_parse_page_metadata(text), main.parse_page_metadata(text)
+        mismatch = "" if old == new else f" ⚠️ {old} vs {new}"
+        old_seconds = time_per_page(bs4_parse_page_metadata, text, args.pages)
+        new_seconds = time_per_page(main.parse_page_metadata, text, args.pages)
+        print(
+            f"   • {shape} ({len(text) / 1024:.0f} KB): "
+            f"BeautifulSoup {old_seconds * 1000:.3f} ms, "
+            f"HeadMetadataParser {new_seconds * 1000:.3f} ms "
+            f"({old_seconds / new_seconds:.1f}x faster){mismatch}"
+        )
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,200 @@
+"""Benchmark chat parsing on synthetic exports
+
+Three modes, meant to be run on the machines the numbers are reported for:
+
+    python parse_benchmark.py scaling --workers 1 2 4 8 16 32 --size-mb 1024
+    python parse_benchmark.py memory --sizes-mb 10 100 500 2048
+    python parse_benchmark.py headers --lines 5000000
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import main
+
+DATETIME_FORMAT = "%d/%m/%y %I:%M %p"
+BLOCK_LINES = 10000
+# Baseline for the header benchmark: the per-line loop before MessageHeaderParser
+ORIGINAL_DATE_PATTERN = (
+    r"^(\d{1,2}/\d{1,2}/\d{2,4}),\s*(\d{1,2}:\d{2}\s*[apAP][mM])\s*-\s*(.*?):\s*(.*)$"
+)
+# Peak RSS includes the chat file's mmap'd pages, which the kernel can reclaim;
+# anonymous RSS (Linux only) is the parser's own memory and should stay flat
+RSS_CHILD = """
+import resource, sys
+import main
+
+def anon_kb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+count = peak_anon = 0
+entries = main.iter_chat_entries(
+    main.iter_url_lines(sys.argv[1], show_progress=False), [], sys.argv[2]
+)
+for count, _ in enumerate(entries, 1):
+    if count % 10000 == 0:
+        peak_anon = max(peak_anon, anon_kb())
+peak_anon = max(peak_anon, anon_kb())
+print(count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, peak_anon)
+"""
+
+
+def synthetic_lines(count):
+    """Return chat lines mixing plain messages, URLs and multi-line continuations"""
+    lines = []
+    for i in range(count):
+        date = f"{i % 28 + 1}/{i // 28 % 12 + 1}/24, {i % 12 + 1}:{i % 60:02d} pm"
+        sender = f"Member {i % 37}"
+        if i % 20 == 0:
+            lines.append(f"{date} - {sender}: look at https://example.com/post/{i}")
+        elif i % 97 == 0:
+            lines.append(f"{date} - {sender}: notes below")
+            lines.append(f"and the link https://example.org/notes/{i}?utm_source=x")
+        else:
+            lines.append(f"{date} - {sender}: message number {i} with some text")
+    return lines
+
+
+def write_synthetic_chat(path, size_bytes):
+    """Write a synthetic chat export of at least ``size_bytes`` bytes"""
+    block = ("\n".join(synthetic_lines(BLOCK_LINES)) + "\n").encode()
+    with open(path, "wb") as file:
+        file.writelines(block for _ in range(-(-size_bytes // len(block))))
+
+
+def count_entries(entries):
+    return sum(1 for _ in entries)
+
+
+def run_scaling(args, workdir):
+    """Compare serial parsing against the sharded parser at each worker count"""
+    path = os.path.join(workdir, "chat.txt")
+    write_synthetic_chat(path, args.size_mb * 1024 * 1024)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    # Load pandas up front so its import time is not charged to the serial run
+    import pandas  # noqa: F401
+
+    start = time.perf_counter()
+    urls = count_entries(
+        main.iter_chat_entries(
+            main.iter_url_lines(path, show_progress=False), [], DATETIME_FORMAT
+        )
+    )
+    serial = time.perf_counter() - start
+    print(f"📁 {size_mb:.0f} MB, {urls} URLs, {os.cpu_count()} CPUs")
+    print(f"   • serial: {serial:.2f}s ({size_mb / serial:.0f} MB/s)")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        parallel_urls = count_entries(
+            main.iter_chat_urls_parallel(
+                path, [], workers=workers, datetime_format=DATETIME_FORMAT
+            )
+        )
+        elapsed = time.perf_counter() - start
+        mismatch = "" if parallel_urls == urls else f" ⚠️ {parallel_urls} URLs"
+        print(
+            f"   • {workers} workers: {elapsed:.2f}s ({size_mb / elapsed:.0f} MB/s, "
+            f"{serial / elapsed:.1f}x serial){mismatch}"
+        )
+
+
+def run_memory(args, workdir):
+    """Report peak RSS of the streaming parser as the input grows"""
+    path = os.path.join(workdir, "chat.txt")
+    for size_mb in args.sizes_mb:
+        write_synthetic_chat(path, size_mb * 1024 * 1024)
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", RSS_CHILD, path, DATETIME_FORMAT],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        elapsed = time.perf_counter() - start
+        urls, max_rss_kb, anon_kb = result.stdout.split()
+        print(
+            f"   • {size_mb} MB: peak RSS {int(max_rss_kb) / 1024:.0f} MB "
+            f"(anonymous {int(anon_kb) / 1024:.0f} MB), {urls} URLs in {elapsed:.1f}s"
+        )
+
+
+def run_headers(args, workdir):
+    """Compare the original per-line regex loop with MessageHeaderParser"""
+    block = synthetic_lines(BLOCK_LINES)
+    lines = block * (args.lines // len(block)) + block[: args.lines % len(block)]
+
+    start = time.perf_counter()
+    original = 0
+    for line in lines:
+        match = re.match(ORIGINAL_DATE_PATTERN, line)
+        if match:
+            original += len(re.findall(main.URL_PATTERN, match.group(4)))
+    original_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = 0
+    for line in lines:
+        header = main.HEADER_PARSER.parse(line)
+        if header:
+            parsed += len(main.HEADER_PARSER.find_urls(header[3]))
+    parser_seconds = time.perf_counter() - start
+
+    print(f"📝 {len(lines)} lines, {parsed} header URLs")
+    print(f"   • original loop: {original_seconds:.2f}s")
+    print(
+        f"   • MessageHeaderParser: {parser_seconds:.2f}s "
+        f"({original_seconds / parser_seconds:.1f}x faster)"
+    )
+    if original != parsed:
+        print(f"   ⚠️ URL counts differ: {original} vs {parsed}")
+
+
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    scaling = modes.add_parser("scaling", help="sharded parse throughput by workers")
+    scaling.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    scaling.add_argument("--size-mb", type=int, default=256)
+    scaling.set_defaults(run=run_scaling)
+
+    memory = modes.add_parser("memory", help="peak RSS of streaming parse by size")
+    memory.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 100, 500])
+    memory.set_defaults(run=run_memory)
+
+    headers = modes.add_parser("headers", help="header regex micro-benchmark")
+    headers.add_argument("--lines", type=int, default=5_000_000)
+    headers.set_defaults(run=run_headers)
+
+    parser.add_argument(
+        "--workdir", help="directory for generated chat files (default: a temp dir)"
+    )
+    return parser.parse_args(argv)
+
+
+def main_benchmark(argv=None):
+    args = parse_args(argv)
+    if args.workdir:
+        args.run(args, args.workdir)
+        return
+    with tempfile.TemporaryDirectory() as workdir:
+        args.run(args, workdir)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,50 @@
+"""Measure cold-start time of main.py with ``python -X importtime``
+
+Run before each release and compare against the previous numbers:
+
+    python startup_benchmark.py
+"""
+
+import subprocess
+import sys
+import time
+
+RUNS = 5
+COMMAND = [sys.executable, "-X", "importtime", "main.py", "--help"]
+TOP_IMPORTS = 10
+
+
+def parse_importtime(stderr):
+    """Return (cumulative_us, module) for top-level imports in -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Nested imports are indented; their time is included in their parent's
+        if module.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports.append((int(cumulative), module.strip()))
+    return imports
+
+
+def main():
+    timings = []
+    imports = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = subprocess.run(COMMAND, capture_output=True, text=True, check=True)
+        elapsed = time.perf_counter() - start
+        if not timings or elapsed < min(timings):
+            imports = parse_importtime(result.stderr)
+        timings.append(elapsed)
+
+    print(f"🚀 Cold start (`main.py --help`, best of {RUNS}): {min(timings):.3f}s")
+    print(f"   • Total import time: {sum(us for us, _ in imports) / 1000:.1f} ms")
+    print("   • Slowest top-level imports:")
+    for us, module in sorted(imports, reverse=True)[:TOP_IMPORTS]:
+        print(f"     - {module}: {us / 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+import main
+
+CONCURRENT_CALLS = 50
+
+
+async def start_stub_server(hits):
+    """Serve a slow page on a free local port, counting requests that reach it"""
+
+    async def page(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        # Slow enough that every caller arrives while the first fetch is in flight
+        await asyncio.sleep(0.2)
+        return web.Response(
+            text="<html><head><title>Stub</title>"
+            "<meta name='description' content='Stub page'></head></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+async def fetch_concurrently(urls):
+    hits = {}
+    runner, base_url = await start_stub_server(hits)
+    try:
+        scheduler = main.FetchScheduler()
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(
+                *(
+                    main.fetch_title_description(session, f"{base_url}{url}", scheduler)
+                    for url in urls
+                )
+            )
+    finally:
+        await runner.cleanup()
+    return results, hits
+
+
+def setup_function():
+    main.FETCH_CACHE.clear()
+    main.INFLIGHT_FETCHES.clear()
+
+
+def test_concurrent_calls_for_one_url_send_one_request():
+    results, hits = asyncio.run(fetch_concurrently(["/page"] * CONCURRENT_CALLS))
+
+    assert hits == {"/page": 1}
+    assert results == [("Stub", "Stub page")] * CONCURRENT_CALLS
+    assert not main.INFLIGHT_FETCHES
+
+
+def test_distinct_urls_are_fetched_separately():
+    results, hits = asyncio.run(fetch_concurrently(["/a", "/b", "/a", "/b"]))
+
+    assert hits == {"/a": 1, "/b": 1}
+    assert results == [("Stub", "Stub page")] * 4
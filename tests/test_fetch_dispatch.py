@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+import main
+
+SLOW_SECONDS = 0.5
+SLOW_URLS = 40
+FAST_URLS = 10
+
+
+async def start_stub_server():
+    """Serve slow and instant pages on a free local port"""
+
+    async def page(request):
+        if request.path.startswith("/slow"):
+            await asyncio.sleep(SLOW_SECONDS)
+        return web.Response(
+            text=f"<html><head><title>{request.path}</title></head></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, runner.addresses[0][1]
+
+
+def url_entry(url, line_num):
+    return {
+        "sender": "Tester",
+        "datetime": main.datetime(2024, 1, 1, 12, 0),
+        "url": url,
+        "line_num": line_num,
+        "original_line": url,
+    }
+
+
+async def fetch_busy_host_then_long_tail():
+    runner, port = await start_stub_server()
+    # Two host names for one server: a busy host and a long-tail host
+    urls = [f"http://127.0.0.1:{port}/slow{i}" for i in range(SLOW_URLS)] + [
+        f"http://localhost:{port}/fast{i}" for i in range(FAST_URLS)
+    ]
+    finished = {}
+    start = time.monotonic()
+
+    def on_result(index, row):
+        finished[index] = (time.monotonic() - start, row["Title"])
+
+    try:
+        await main.fetch_all_urls(
+            [url_entry(url, i) for i, url in enumerate(urls)],
+            max_concurrent=20,
+            max_per_host=4,
+            parse_workers=0,
+            on_result=on_result,
+        )
+    finally:
+        await runner.cleanup()
+    return [finished[i] for i in range(len(urls))]
+
+
+def setup_function():
+    main.FETCH_CACHE.clear()
+    main.INFLIGHT_FETCHES.clear()
+
+
+def test_long_tail_urls_are_not_held_back_by_a_busy_host():
+    rows = asyncio.run(fetch_busy_host_then_long_tail())
+    slow, fast = rows[:SLOW_URLS], rows[SLOW_URLS:]
+
+    assert [title for _, title in fast] == [f"/fast{i}" for i in range(FAST_URLS)]
+    assert [title for _, title in slow] == [f"/slow{i}" for i in range(SLOW_URLS)]
+    # The busy host needs several rounds of its few slots; the long tail does not
+    assert max(elapsed for elapsed, _ in slow) > 3 * SLOW_SECONDS
+    assert max(elapsed for elapsed, _ in fast) < 2 * SLOW_SECONDS
@@ -0,0 +1,146 @@
+import pytest
+
+import main
+
+# (name, html, expected (title, description)), recorded from the BeautifulSoup
+# extractor that HeadMetadataParser replaced
+PAGES = [
+    (
+        "title_and_description",
+        (
+            "<html><head><title> Hello </title>"
+            "<meta name='description' content=' A page '></head></html>"
+        ),
+        ("Hello", "A page"),
+    ),
+    ("no_head", "<title>Bare</title>", ("Bare", "N/A")),
+    ("title_in_body", "<body><title>Body</title></body>", ("Body", "N/A")),
+    ("unclosed_title", "<head><title>Open", ("Open", "N/A")),
+    ("two_titles", "<head><title>One</title><title>Two</title></head>", ("One", "N/A")),
+    (
+        "empty_title_uses_og_title",
+        "<head><title></title><meta property='og:title' content=' OG '></head>",
+        ("OG", "N/A"),
+    ),
+    (
+        "whitespace_title",
+        "<head><title>   </title><meta property='og:title' content='OG'></head>",
+        ("", "N/A"),
+    ),
+    (
+        "og_title_without_content",
+        "<head><meta property='og:title'></head>",
+        ("N/A", "N/A"),
+    ),
+    (
+        "og_title_empty_content",
+        "<head><meta property='og:title' content=''></head>",
+        ("", "N/A"),
+    ),
+    ("entities", "<head><title>A &amp; B &#x41;</title></head>", ("A & B A", "N/A")),
+    (
+        "uppercase_tags",
+        "<HEAD><TITLE>Up</TITLE><META NAME='description' CONTENT='d'></HEAD>",
+        ("Up", "d"),
+    ),
+    # A title whose only child is a tag, comment or other string node takes
+    # that node's text; more than one child means no title string at all
+    ("lone_nested_tag", "<head><title><b>x</b></title></head>", ("x", "N/A")),
+    (
+        "deeply_nested_tag",
+        "<head><title><b><i> y </i></b></title></head>",
+        ("y", "N/A"),
+    ),
+    ("text_and_tag", "<head><title>a<b>x</b></title></head>", ("N/A", "N/A")),
+    (
+        "text_and_tag_uses_og_title",
+        "<head><title>a<b>x</b></title><meta property='og:title' content='OG'></head>",
+        ("OG", "N/A"),
+    ),
+    ("void_tag_only", "<head><title><br></title></head>", ("N/A", "N/A")),
+    (
+        "comment_between_text",
+        "<head><title>a<!-- c -->b</title></head>",
+        ("N/A", "N/A"),
+    ),
+    ("comment_only", "<head><title><!-- c --></title></head>", ("c", "N/A")),
+    (
+        "cdata_between_text",
+        "<head><title>a<![CDATA[x]]>b</title></head>",
+        ("N/A", "N/A"),
+    ),
+    ("pi_between_text", "<head><title>a<?php x ?>b</title></head>", ("N/A", "N/A")),
+    (
+        "declaration_between_text",
+        "<head><title>a<!DOCTYPE x>b</title></head>",
+        ("N/A", "N/A"),
+    ),
+    (
+        "description_precedence",
+        (
+            "<head><meta name='Description' content='D3'>"
+            "<meta property='og:description' content='D2'>"
+            "<meta name='description' content='D1'></head>"
+        ),
+        ("N/A", "D1"),
+    ),
+    (
+        "og_description_before_capitalized",
+        (
+            "<head><meta name='Description' content='D3'>"
+            "<meta property='og:description' content='D2'></head>"
+        ),
+        ("N/A", "D2"),
+    ),
+    (
+        "empty_preferred_description",
+        (
+            "<head><meta name='description' content=''>"
+            "<meta property='og:description' content='D2'></head>"
+        ),
+        ("N/A", "N/A"),
+    ),
+    (
+        "description_without_content",
+        (
+            "<head><meta name='description'><meta property='og:description' content='D2'>"
+            "</head>"
+        ),
+        ("N/A", "N/A"),
+    ),
+    (
+        "script_before_title",
+        "<head><script>var t = '<title>no</title>';</script><title>Yes</title></head>",
+        ("Yes", "N/A"),
+    ),
+]
+
+# Intentional difference: tags after </head> are ignored, because the fetcher
+# stops reading there; BeautifulSoup gave ("Late", "late")
+AFTER_HEAD = (
+    "<head></head><body><title>Late</title>"
+    "<meta name='description' content='late'></body>"
+)
+
+
+@pytest.mark.parametrize(
+    ("html", "expected"),
+    [(html, expected) for _, html, expected in PAGES],
+    ids=[name for name, _, _ in PAGES],
+)
+def test_matches_recorded_results(html, expected):
+    assert main.parse_page_metadata(html) == expected
+
+
+@pytest.mark.parametrize(
+    "html", [html for _, html, _ in PAGES], ids=[name for name, _, _ in PAGES]
+)
+def test_matches_beautifulsoup(html):
+    pytest.importorskip("bs4")
+    from metadata_benchmark import bs4_parse_page_metadata
+
+    assert main.parse_page_metadata(html) == bs4_parse_page_metadata(html)
+
+
+def test_ignores_tags_after_head():
+    assert main.parse_page_metadata(AFTER_HEAD) == ("N/A", "N/A")